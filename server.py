@@ -4,28 +4,259 @@
 # SPDX-License-Identifier: BSD 2-Clause License
 #
 
+import asyncio
+import functools
 import http.server
-import json
 import os
 import signal
-import socketserver
-import subprocess
+import stat
 import sys
+import threading
+from collections import deque
 from pathlib import Path
 import time
 import socket
 
+import orjson
+import psutil
+
 # Store active processes
 active_processes = {}
 
 # Store process logs
 process_logs = {}
 
+# Protects process_logs, which is updated by the bot event loop while request
+# threads read it
+logs_lock = threading.Lock()
+
+# Serializes starting and stopping bot processes across request threads
+bot_lock = threading.Lock()
+
+# Store the tasks reading the output of each process
+log_readers = {}
+
+# Maximum number of log lines kept for each stream of a process
+MAX_LOG_LINES = 1000
+
+# Longest line of bot output that is kept in the logs, in bytes
+MAX_LINE_LENGTH = 1024 * 1024
+
+# Event loop that spawns the bot processes and reads their output, running in
+# its own thread so a single reader serves all the processes
+bot_loop = asyncio.new_event_loop()
+
+# Error message if the credential files are missing, checked once at startup
+CREDS_ERROR = None
+
 # Get the directory of this script
 SCRIPT_DIR = Path(__file__).parent.absolute()
 BOT_SCRIPT = SCRIPT_DIR / "bot.py"
 
+# Content types of the static files, by file extension
+_CTYPES = {
+    '.html': 'text/html',
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+    '.json': 'application/json',
+}
+
+# Files up to this size are kept in memory after the first request
+SMALL_FILE_SIZE = 64 * 1024
+
+
+# Files that must never be served, as casefolded names
+_PRIVATE_FILES = {'.env', 'creds.json'}
+
+# Static files by URL path, built at startup: (path, content type, size, data)
+# where data holds the contents of small files and is None for larger ones
+_STATIC_INDEX = {}
+
+
+@functools.lru_cache(maxsize=64)
+def _read_small_file(path, mtime):
+    """Read a small static file, cached by path and modification time"""
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _is_private(path):
+    """Check if a path refers to a private file, whatever case it's spelled in"""
+    if path.name.casefold() in _PRIVATE_FILES:
+        return True
+    # Also catch other names for the same file, such as Windows short names
+    for name in _PRIVATE_FILES:
+        try:
+            if os.path.samefile(path, SCRIPT_DIR / name):
+                return True
+        except OSError:
+            pass
+    return False
+
+
+def _static_entry(path, file_stat):
+    """Build the static index entry of a file"""
+    content_type = _CTYPES.get(path.suffix.lower(), 'application/octet-stream')
+    size = file_stat.st_size
+    data = _read_small_file(path, file_stat.st_mtime_ns) if size <= SMALL_FILE_SIZE else None
+    return path, content_type, size, data
+
+
+def _build_static_index():
+    """Index the files served from SCRIPT_DIR so requests don't hit the filesystem"""
+    _STATIC_INDEX.clear()
+    with os.scandir(SCRIPT_DIR) as entries:
+        for entry in entries:
+            if not entry.is_file() or _is_private(Path(entry.path)):
+                continue
+            _STATIC_INDEX['/' + entry.name] = _static_entry(Path(entry.path), entry.stat())
+
+
+def is_port_in_use(port):
+    """Check if a local port is in use by trying to bind to it"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # On Windows SO_REUSEADDR would let us bind to a port that is in use
+        if sys.platform != 'win32':
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(('localhost', port))
+            return False
+        except OSError:
+            return True
+
+
+def pids_on_port(port):
+    """Find the processes listening on a local port"""
+    try:
+        return {
+            conn.pid for conn in psutil.net_connections('inet')
+            if conn.laddr and conn.laddr.port == port
+            and conn.status == psutil.CONN_LISTEN and conn.pid
+        }
+    except psutil.AccessDenied:
+        # Listing all connections requires root on macOS, so only check the
+        # processes we are allowed to inspect
+        pids = set()
+        for process in psutil.process_iter():
+            try:
+                # Unbound sockets have an empty laddr
+                if any(conn.laddr and conn.laddr.port == port
+                       and conn.status == psutil.CONN_LISTEN
+                       for conn in process.net_connections('inet')):
+                    pids.add(process.pid)
+            except (psutil.AccessDenied, psutil.NoSuchProcess):
+                pass
+        return pids
+
+
+def kill_processes_on_port(port, force=False):
+    """Kill the processes listening on a local port, gracefully unless forced"""
+    for port_pid in pids_on_port(port) - {os.getpid()}:
+        try:
+            process = psutil.Process(port_pid)
+            if force:
+                process.kill()
+            else:
+                process.terminate()
+                try:
+                    process.wait(timeout=3)
+                except psutil.TimeoutExpired:
+                    process.kill()
+            print(f"Killed process {port_pid} using port {port}")
+        except psutil.NoSuchProcess:
+            pass
+
+
+def _run_in_bot_loop(coro):
+    """Run a coroutine in the bot event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, bot_loop).result()
+
+
+async def _read_output(stream, lines):
+    """Append the lines of a process output stream to a bounded log"""
+    try:
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Longer than MAX_LINE_LENGTH, readline() already dropped it.
+                # Keep reading so the bot never blocks on a full pipe.
+                line = b'[line too long, skipped]'
+            if not line:
+                break
+            line = line.decode(errors='replace').strip()
+            with logs_lock:
+                lines.append(line)
+    except Exception as e:
+        print(f"Error reading bot output: {e}")
+
+
+async def _spawn_bot():
+    """Start a bot.py process and begin collecting its logs"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(BOT_SCRIPT),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=SCRIPT_DIR,
+        limit=MAX_LINE_LENGTH
+    )
+    logs = {"stdout": deque(maxlen=MAX_LOG_LINES), "stderr": deque(maxlen=MAX_LOG_LINES)}
+    with logs_lock:
+        process_logs[process.pid] = logs
+    readers = asyncio.gather(
+        _read_output(process.stdout, logs["stdout"]),
+        _read_output(process.stderr, logs["stderr"]),
+        return_exceptions=True
+    )
+    log_readers[process.pid] = readers
+
+    def remove_readers(_):
+        # However the process was stopped, forget the readers once the output
+        # is fully read, unless the pid was already reused by a new process
+        if log_readers.get(process.pid) is readers:
+            del log_readers[process.pid]
+
+    readers.add_done_callback(remove_readers)
+    return process
+
+
+async def _wait_for_exit(process, timeout=None):
+    """Wait for a bot process to exit and its remaining output to be read"""
+    await asyncio.wait_for(process.wait(), timeout)
+    readers = log_readers.get(process.pid)
+    if readers:
+        await readers
+
+
+class ReusableServer(http.server.ThreadingHTTPServer):
+    """HTTP server handling at most max_workers requests at a time"""
+    max_workers = 8
+
+    def __init__(self, *args, **kwargs):
+        self.slots = threading.BoundedSemaphore(self.max_workers)
+        super().__init__(*args, **kwargs)
+
+    def process_request(self, request, client_address):
+        # Requests still run on ThreadingHTTPServer's daemon threads, so an
+        # idle connection can't keep the server alive after Ctrl+C
+        self.slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self.slots.release()
+
+
 class ServerRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Drop connections that stay idle, so they don't hold one of the server's slots
+    timeout = 30
+
     def _set_response_headers(self, content_type="application/json"):
         self.send_response(200)
         self.send_header('Content-type', content_type)
@@ -44,173 +275,151 @@ class ServerRequestHandler(http.server.SimpleHTTPRequestHandler):
             self.path = '/index.html'
         
         try:
-            # Check if file exists
-            file_to_open = SCRIPT_DIR / self.path.lstrip('/')
-            if file_to_open.exists():
-                # Determine content type
-                if self.path.endswith('.html'):
-                    content_type = 'text/html'
-                elif self.path.endswith('.js'):
-                    content_type = 'application/javascript'
-                elif self.path.endswith('.css'):
-                    content_type = 'text/css'
-                elif self.path.endswith('.json'):
-                    content_type = 'application/json'
-                elif self.path.endswith('.proto'):
-                    content_type = 'application/protobuf'
-                else:
-                    content_type = 'application/octet-stream'
-                
-                self.send_response(200)
-                self.send_header('Content-type', content_type)
-                self.end_headers()
-                
+            entry = _STATIC_INDEX.get(self.path)
+            if entry is None:
+                # Not in the index, check the filesystem in case it was added
+                # after the server started
+                file_to_open = (SCRIPT_DIR / self.path.lstrip('/')).resolve()
+                file_stat = None
+                # Never serve anything outside SCRIPT_DIR, e.g. /../../etc/hostname
+                if file_to_open.is_relative_to(SCRIPT_DIR.resolve()):
+                    try:
+                        file_stat = file_to_open.stat()
+                    except OSError:
+                        pass
+
+                if (file_stat and stat.S_ISREG(file_stat.st_mode)
+                        and not _is_private(file_to_open)):
+                    entry = _static_entry(file_to_open, file_stat)
+
+            if entry and entry[3] is not None:
+                _, content_type, size, data = entry
+                self._send_file_headers(content_type, size)
+                self.wfile.write(data)
+            elif entry:
+                file_to_open, content_type, _, _ = entry
                 with open(file_to_open, 'rb') as file:
-                    self.wfile.write(file.read())
+                    # Use the current size, the file may have changed since
+                    # it was indexed
+                    size = os.fstat(file.fileno()).st_size
+                    self._send_file_headers(content_type, size)
+                    self._send_file(file, size)
             else:
                 self.send_response(404)
                 self.send_header('Content-type', 'text/html')
                 self.end_headers()
                 self.wfile.write(b'404 - File Not Found')
                 
+        except ConnectionError:
+            # The client went away while the file was being sent, the headers
+            # are already out so there's nothing left to report
+            self.close_connection = True
         except Exception as e:
             self.send_response(500)
             self.send_header('Content-type', 'text/html')
             self.end_headers()
             self.wfile.write(f'500 - Server Error: {str(e)}'.encode())
 
+    def _send_file_headers(self, content_type, size):
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+
+    def _send_file(self, file, size):
+        """Send a file to the client without copying it through user space"""
+        # Uses os.sendfile where the platform supports it and falls back to
+        # plain sends otherwise. Errors from the client side are raised.
+        self.connection.sendfile(file, 0, size)
+
     def do_POST(self):
         if self.path == '/start-bot':
-            self._start_bot()
+            with bot_lock:
+                self._start_bot()
         elif self.path == '/stop-bot':
-            self._stop_bot()
+            with bot_lock:
+                self._stop_bot()
         elif self.path == '/bot-logs':
             self._get_bot_logs()
         else:
             self.send_response(404)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({"error": "Endpoint not found"}).encode())
+            self.wfile.write(orjson.dumps({"error": "Endpoint not found"}))
 
     def _start_bot(self):
         try:
+            # Reuse a running bot, it keeps serving new sessions without
+            # having to load its models again
+            for pid, process in active_processes.items():
+                if process.returncode is None:
+                    print(f"Reusing bot.py process with PID: {pid}")
+                    self._set_response_headers()
+                    self.wfile.write(orjson.dumps({"success": True, "pid": pid, "reused": True}))
+                    return
+
             # Check if port 8765 is in use
-            def is_port_in_use(port):
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    return s.connect_ex(('localhost', port)) == 0
-            
             if is_port_in_use(8765):
                 print("Port 8765 is in use, attempting to free it...")
                 # Try to kill any process using port 8765
-                if sys.platform == 'win32':
-                    subprocess.run(['taskkill', '/F', '/IM', 'python.exe'], capture_output=True)
-                else:
-                    try:
-                        result = subprocess.run(['lsof', '-ti', ':8765'], capture_output=True, text=True)
-                        if result.stdout:
-                            port_pids = result.stdout.strip().split('\n')
-                            for port_pid in port_pids:
-                                try:
-                                    os.kill(int(port_pid), signal.SIGKILL)
-                                    print(f"Killed process {port_pid} using port 8765")
-                                except ProcessLookupError:
-                                    pass
-                    except FileNotFoundError:
-                        subprocess.run(['pkill', '-f', 'bot.py'], capture_output=True)
+                kill_processes_on_port(8765)
                 
                 # Wait a moment for the port to be freed
                 time.sleep(1)
             
-            # Check if Google Cloud credentials exist
-            creds_path = SCRIPT_DIR / "creds.json"
-            if not creds_path.exists():
-                print(f"Google Cloud credentials file not found at {creds_path}")
-                self._set_response_headers()
-                self.wfile.write(json.dumps({
-                    "success": False, 
-                    "error": f"Google Cloud credentials file not found at {creds_path}. Please create this file with your Google Cloud credentials."
-                }).encode())
-                return
-            
-            # Check if .env file exists (for OpenAI API key)
-            env_path = SCRIPT_DIR / ".env"
-            if not env_path.exists():
-                print(f".env file not found at {env_path}")
+            # Check the credentials validated at startup
+            if CREDS_ERROR:
+                print(CREDS_ERROR)
                 self._set_response_headers()
-                self.wfile.write(json.dumps({
+                self.wfile.write(orjson.dumps({
                     "success": False, 
-                    "error": f".env file not found at {env_path}. Please create this file with your OpenAI API key."
-                }).encode())
+                    "error": CREDS_ERROR
+                }))
                 return
 
             # Start the bot.py process
             print(f"Starting bot.py from {SCRIPT_DIR}")
-            process = subprocess.Popen(
-                [sys.executable, str(BOT_SCRIPT)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=SCRIPT_DIR
-            )
+            process = _run_in_bot_loop(_spawn_bot())
             
             pid = process.pid
             active_processes[pid] = process
-            process_logs[pid] = {"stdout": [], "stderr": []}
-            
-            # Start non-blocking log reading threads
-            def read_output(pipe, log_type, pid):
-                for line in iter(pipe.readline, ''):
-                    if pid in process_logs:
-                        process_logs[pid][log_type].append(line.strip())
-                pipe.close()
-            
-            import threading
-            stdout_thread = threading.Thread(
-                target=read_output,
-                args=(process.stdout, "stdout", pid),
-                daemon=True
-            )
-            stderr_thread = threading.Thread(
-                target=read_output,
-                args=(process.stderr, "stderr", pid),
-                daemon=True
-            )
-            stdout_thread.start()
-            stderr_thread.start()
             
             # Poll the process to see if it's still running after a short delay
             time.sleep(0.5)
-            if process.poll() is not None:
+            if process.returncode is not None:
                 # Process exited immediately
-                output, error = process.communicate()
+                _run_in_bot_loop(_wait_for_exit(process))
+                with logs_lock:
+                    output = "\n".join(process_logs[pid]["stdout"])
+                    error = "\n".join(process_logs[pid]["stderr"])
                 print(f"Bot process exited immediately with code {process.returncode}")
                 print(f"STDOUT: {output}")
                 print(f"STDERR: {error}")
                 self.send_response(500)
                 self.send_header('Content-type', 'application/json')
                 self.end_headers()
-                self.wfile.write(json.dumps({
+                self.wfile.write(orjson.dumps({
                     "success": False, 
                     "error": f"Bot failed to start (exit code {process.returncode}): {error}"
-                }).encode())
+                }))
                 return
             
             print(f"Started bot.py process with PID: {pid}")
             
             self._set_response_headers()
-            self.wfile.write(json.dumps({"success": True, "pid": pid}).encode())
+            self.wfile.write(orjson.dumps({"success": True, "pid": pid}))
             
         except Exception as e:
             print(f"Error starting bot.py: {e}")
             self.send_response(500)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({"success": False, "error": str(e)}).encode())
+            self.wfile.write(orjson.dumps({"success": False, "error": str(e)}))
 
     def _stop_bot(self):
         content_length = int(self.headers['Content-Length'])
         post_data = self.rfile.read(content_length)
-        data = json.loads(post_data.decode('utf-8'))
+        data = orjson.loads(post_data)
         
         pid = data.get('pid')
         force = data.get('force', False)
@@ -219,33 +428,15 @@ class ServerRequestHandler(http.server.SimpleHTTPRequestHandler):
         try:
             if force_port:
                 # Kill any process using the specified port
-                if sys.platform == 'win32':
-                    # On Windows
-                    subprocess.run(['taskkill', '/F', '/IM', 'python.exe'], capture_output=True)
-                else:
-                    # On Unix/Linux
-                    try:
-                        # Find process using port
-                        result = subprocess.run(['lsof', '-ti', f':{force_port}'], capture_output=True, text=True)
-                        if result.stdout:
-                            port_pids = result.stdout.strip().split('\n')
-                            for port_pid in port_pids:
-                                try:
-                                    os.kill(int(port_pid), signal.SIGKILL)
-                                    print(f"Force killed process {port_pid} using port {force_port}")
-                                except ProcessLookupError:
-                                    pass
-                    except FileNotFoundError:
-                        # If lsof is not available, try a more aggressive approach
-                        subprocess.run(['pkill', '-f', 'bot.py'], capture_output=True)
+                kill_processes_on_port(force_port, force=True)
                 
                 self._set_response_headers()
-                self.wfile.write(json.dumps({"success": True}).encode())
+                self.wfile.write(orjson.dumps({"success": True}))
                 return
             
             if not pid or pid not in active_processes:
                 self._set_response_headers()
-                self.wfile.write(json.dumps({"success": False, "error": "Process not found"}).encode())
+                self.wfile.write(orjson.dumps({"success": False, "error": "Process not found"}))
                 return
             
             process = active_processes[pid]
@@ -266,9 +457,9 @@ class ServerRequestHandler(http.server.SimpleHTTPRequestHandler):
                     
                 # Give it a moment to terminate
                 try:
-                    process.wait(timeout=3)
+                    _run_in_bot_loop(_wait_for_exit(process, timeout=3))
                     print(f"Successfully terminated bot process with PID: {pid}")
-                except subprocess.TimeoutExpired:
+                except asyncio.TimeoutError:
                     # If it doesn't terminate, force kill
                     if sys.platform == 'win32':
                         process.kill()
@@ -280,50 +471,64 @@ class ServerRequestHandler(http.server.SimpleHTTPRequestHandler):
             # Keep the logs in process_logs for viewing even after stopping
             
             self._set_response_headers()
-            self.wfile.write(json.dumps({"success": True}).encode())
+            self.wfile.write(orjson.dumps({"success": True}))
             
         except Exception as e:
             print(f"Error stopping bot.py (PID {pid}): {e}")
             self.send_response(500)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({"success": False, "error": str(e)}).encode())
+            self.wfile.write(orjson.dumps({"success": False, "error": str(e)}))
 
     def _get_bot_logs(self):
         content_length = int(self.headers.get('Content-Length', 0))
         if content_length > 0:
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = orjson.loads(post_data)
             pid = data.get('pid')
         else:
             pid = None
             
-        if pid and pid in process_logs:
-            logs = process_logs[pid]
+        with logs_lock:
+            if not pid and process_logs:
+                # Return logs for the most recently started process
+                pid = max(process_logs.keys())
+            logs = process_logs.get(pid)
+            if logs:
+                stdout = list(logs["stdout"])
+                stderr = list(logs["stderr"])
+
+        if logs:
             self._set_response_headers()
-            self.wfile.write(json.dumps({
+            self.wfile.write(orjson.dumps({
                 "success": True,
                 "pid": pid,
-                "stdout": logs["stdout"],
-                "stderr": logs["stderr"]
-            }).encode())
-        elif not pid and process_logs:
-            # Return logs for the most recently started process
-            latest_pid = max(process_logs.keys())
-            logs = process_logs[latest_pid]
-            self._set_response_headers()
-            self.wfile.write(json.dumps({
-                "success": True,
-                "pid": latest_pid,
-                "stdout": logs["stdout"],
-                "stderr": logs["stderr"]
-            }).encode())
+                "stdout": stdout,
+                "stderr": stderr
+            }))
         else:
             self._set_response_headers()
-            self.wfile.write(json.dumps({
+            self.wfile.write(orjson.dumps({
                 "success": False,
                 "error": "No bot logs available"
-            }).encode())
+            }))
+
+
+def _validate_creds():
+    """Check that the credential files needed by bot.py exist"""
+    global CREDS_ERROR
+    CREDS_ERROR = None
+
+    # Check if Google Cloud credentials exist
+    creds_path = SCRIPT_DIR / "creds.json"
+    if not creds_path.exists():
+        CREDS_ERROR = f"Google Cloud credentials file not found at {creds_path}. Please create this file with your Google Cloud credentials."
+        return
+
+    # Check if .env file exists (for OpenAI API key)
+    env_path = SCRIPT_DIR / ".env"
+    if not env_path.exists():
+        CREDS_ERROR = f".env file not found at {env_path}. Please create this file with your OpenAI API key."
 
 
 def cleanup():
@@ -344,8 +549,16 @@ def main():
         port = 8000
         handler = ServerRequestHandler
         
+        _validate_creds()
+        if CREDS_ERROR:
+            print(CREDS_ERROR)
+
+        _build_static_index()
+
+        threading.Thread(target=bot_loop.run_forever, daemon=True).start()
+
         print(f"Starting server on port {port}...")
-        with socketserver.TCPServer(("", port), handler) as httpd:
+        with ReusableServer(("", port), handler) as httpd:
             print(f"Server started at http://localhost:{port}")
             httpd.serve_forever()
     except KeyboardInterrupt: